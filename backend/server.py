@@ -1,28 +1,83 @@
+import asyncio
+import hashlib
 import os
-import uuid
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Depends, status
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, List, Optional, Dict, Any, Tuple
+from fastapi import FastAPI, HTTPException, Body, Depends, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings
-import motor.motor_asyncio
-from pymongo.errors import DuplicateKeyError
+import orjson
+from async_lru import alru_cache
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import AsyncMongoClient, IndexModel, UpdateOne, WriteConcern
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 class Settings(BaseSettings):
     mongo_url: str = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/grocery_platform')
+    redis_url: str = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
     firebase_project_id: str = os.environ.get('FIREBASE_PROJECT_ID', 'dummy-project-id')
     firebase_api_key: str = os.environ.get('FIREBASE_API_KEY', 'dummy-api-key')
 
 settings = Settings()
 
-# MongoDB connection
-client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongo_url)
-db = client.grocery_platform
+# MongoDB connection pool; the client is created in startup_event so it binds to the running loop
+MONGO_POOL_OPTIONS = {"maxPoolSize": 100, "minPoolSize": 20, "maxIdleTimeMS": 30000}
+
+# Bulk product inserts skip the journal wait to favour throughput
+BULK_WRITE_CONCERN = WriteConcern(w=1, j=False)
+# Booking inserts are unacknowledged: the response does not wait for the server and
+# server-side failures are never reported. Users and orders, including bulk orders,
+# wait for a majority acknowledgement.
+FAST_WRITE_CONCERN = WriteConcern(w=0)
+DURABLE_WRITE_CONCERN = WriteConcern(w="majority")
+
+# Redis cache for near-static responses; created in startup_event like the Mongo client.
+# Short socket timeouts make an unreachable host raise RedisError instead of hanging requests.
+REDIS_OPTIONS = {"socket_timeout": 0.5, "socket_connect_timeout": 0.5}
+CACHE_TTL_SECONDS = 45
+
+# In-process cache of serialized listings, checked before Redis. It is per worker and
+# cannot be invalidated across workers, so it only fronts listings with no write endpoint
+# (cab and handyman services); direct database edits show up within the TTL.
+LOCAL_CACHE_SIZE = 256
+LOCAL_CACHE_TTL_SECONDS = 60
+
+# List endpoints are paginated and pull each page with cursor.to_list()
+# instead of iterating one document at a time.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Enforced on the request body, so oversized bulk lists are rejected during validation
+MAX_BULK_SIZE = MAX_PAGE_SIZE
+CURSOR_BATCH_SIZE = 500
+
+# Fields the frontend renders for store and product listings
+STORE_LIST_PROJECTION = {
+    "id": 1, "name": 1, "description": 1, "category": 1,
+    "location": 1, "rating": 1, "delivery_time": 1, "is_active": 1,
+}
+PRODUCT_LIST_PROJECTION = {
+    "id": 1, "name": 1, "price": 1, "images": 1,
+    "store_id": 1, "category": 1, "stock": 1,
+}
+
+# Responses are rendered with orjson; default=str covers ObjectId and other BSON types
+def dump_json(content: Any) -> bytes:
+    return orjson.dumps(content, default=str, option=orjson.OPT_NAIVE_UTC)
+
+class MongoJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
 
 # FastAPI app
-app = FastAPI(title="Multi-Service Platform API", version="1.0.0")
+app = FastAPI(title="Multi-Service Platform API", version="1.0.0", default_response_class=MongoJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -37,18 +92,31 @@ app.add_middleware(
 security = HTTPBearer()
 
 # Pydantic Models
-class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+DELIVERY_ESTIMATE = timedelta(minutes=45)
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def new_id() -> str:
+    # ObjectId hex: 24 chars and time-ordered, so id index inserts stay append-mostly
+    return str(ObjectId())
+
+class APIModel(BaseModel):
+    # Request DTOs: drop unknown fields and never re-validate on assignment
+    model_config = ConfigDict(extra="ignore", validate_assignment=False)
+
+class User(APIModel):
+    id: str = Field(default_factory=new_id)
     email: str
     name: str
     phone: str
     role: str = "customer"  # customer, driver, admin, vendor
     location: Dict[str, Any] = {}
     is_active: bool = True
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=utc_now)
 
-class Store(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Store(APIModel):
+    id: str = Field(default_factory=new_id)
     name: str
     description: str
     category: str  # grocery, electronics, fashion, etc.
@@ -57,10 +125,10 @@ class Store(BaseModel):
     is_active: bool = True
     rating: float = 0.0
     delivery_time: str = "30-45 mins"
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=utc_now)
 
-class Product(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Product(APIModel):
+    id: str = Field(default_factory=new_id)
     name: str
     description: str
     price: float
@@ -69,10 +137,10 @@ class Product(BaseModel):
     images: List[str] = []
     stock: int = 0
     is_available: bool = True
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=utc_now)
 
-class CabService(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class CabService(APIModel):
+    id: str = Field(default_factory=new_id)
     service_type: str  # economy, premium, suv
     available_slots: int
     price_per_km: float
@@ -80,8 +148,8 @@ class CabService(BaseModel):
     location: Dict[str, Any]
     is_active: bool = True
 
-class CabBooking(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class CabBooking(APIModel):
+    id: str = Field(default_factory=new_id)
     user_id: str
     driver_id: Optional[str] = None
     pickup_location: Dict[str, Any]
@@ -89,10 +157,10 @@ class CabBooking(BaseModel):
     service_type: str
     status: str = "pending"  # pending, confirmed, in-progress, completed, cancelled
     fare: float = 0.0
-    booking_time: datetime = Field(default_factory=datetime.now)
+    booking_time: datetime = Field(default_factory=utc_now)
 
-class HandymanService(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class HandymanService(APIModel):
+    id: str = Field(default_factory=new_id)
     category: str  # plumbing, electrical, cleaning, etc.
     professional_id: str
     name: str
@@ -103,8 +171,8 @@ class HandymanService(BaseModel):
     location: Dict[str, Any]
     is_active: bool = True
 
-class HandymanBooking(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class HandymanBooking(APIModel):
+    id: str = Field(default_factory=new_id)
     user_id: str
     service_id: str
     professional_id: str
@@ -112,23 +180,169 @@ class HandymanBooking(BaseModel):
     time_slot: str
     status: str = "pending"
     price: float = 0.0
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=utc_now)
 
-class Order(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Order(APIModel):
+    id: str = Field(default_factory=new_id)
     user_id: str
     store_id: str
     items: List[Dict[str, Any]]
     total_amount: float
     delivery_address: Dict[str, Any]
     status: str = "pending"  # pending, confirmed, preparing, out_for_delivery, delivered
-    order_time: datetime = Field(default_factory=datetime.now)
-    estimated_delivery: datetime = Field(default_factory=lambda: datetime.now() + timedelta(minutes=45))
+    order_time: datetime = Field(default_factory=utc_now)
+    estimated_delivery: datetime = Field(default_factory=lambda: utc_now() + DELIVERY_ESTIMATE)
 
 # Auth middleware (dummy for now)
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
-    # In production, verify Firebase token here
-    return {"uid": "dummy-user-id", "email": "user@example.com"}
+@dataclass(frozen=True, slots=True)
+class AuthCtx:
+    uid: str
+    email: str
+
+DUMMY_AUTH_CTX = AuthCtx(uid="dummy-user-id", email="user@example.com")
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> AuthCtx:
+    # In production, verify Firebase token here. FastAPI caches this dependency
+    # per request, so the token is decoded once however many routes depend on it.
+    return DUMMY_AUTH_CTX
+
+# Database dependency
+def get_db(request: Request) -> AsyncDatabase:
+    return request.app.state.db
+
+# Pagination
+def pagination_params(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    return {"skip": skip, "limit": limit, "cursor": cursor}
+
+async def fetch_page(collection, query: Dict[str, Any], page: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
+    # Keyset pagination on _id: clients pass back next_cursor instead of a large skip
+    if page["cursor"]:
+        try:
+            query["_id"] = {"$gt": ObjectId(page["cursor"])}
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    cursor = (
+        collection.find(query, projection)
+        .sort("_id", 1)
+        .skip(page["skip"])
+        .limit(page["limit"])
+        .batch_size(CURSOR_BATCH_SIZE)
+    )
+    docs = await cursor.to_list(length=page["limit"])
+    next_cursor = str(docs[-1]["_id"]) if len(docs) == page["limit"] else None
+    # Remove ObjectId so documents can be returned as-is
+    for doc in docs:
+        del doc["_id"]
+    return docs, next_cursor
+
+async def insert_bulk(collection, items: List[BaseModel], kind: str) -> List[str]:
+    if not items:
+        raise HTTPException(status_code=400, detail=f"No {kind} provided")
+    try:
+        await collection.insert_many([item.model_dump() for item in items], ordered=False, bypass_document_validation=True)
+    except BulkWriteError as e:
+        # Unordered inserts can partially succeed; report exactly what was committed
+        failed = {err["index"]: err["errmsg"] for err in e.details.get("writeErrors", [])}
+        raise HTTPException(status_code=400, detail={
+            "message": f"Some {kind} could not be created",
+            "inserted_ids": [item.id for index, item in enumerate(items) if index not in failed],
+            "failed": [{"index": index, "error": errmsg} for index, errmsg in sorted(failed.items())],
+            "write_concern_errors": [err["errmsg"] for err in e.details.get("writeConcernErrors", [])],
+        })
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [item.id for item in items]
+
+# Cache helpers; a Redis outage falls back to querying MongoDB
+async def cache_get(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        cached = await app.state.redis.get(key)
+    except RedisError:
+        return None
+    return orjson.loads(cached) if cached else None
+
+async def cache_set(key: str, value: Dict[str, Any]) -> None:
+    try:
+        await app.state.redis.setex(key, CACHE_TTL_SECONDS, dump_json(value))
+    except RedisError:
+        pass
+
+async def cache_invalidate(prefix: str) -> None:
+    try:
+        keys = [key async for key in app.state.redis.scan_iter(match=f"{prefix}:*")]
+        if keys:
+            await app.state.redis.delete(*keys)
+    except RedisError:
+        pass
+
+def page_cache_key(prefix: str, page: Dict[str, Any], *filters: Optional[str]) -> str:
+    return ":".join([prefix, *(f or "" for f in filters), str(page["skip"]), str(page["limit"]), page["cursor"] or ""])
+
+# Dashboard revenue; only computed when the cached dashboard response has expired
+async def get_order_revenue(db: AsyncDatabase) -> float:
+    cursor = await db.orders.aggregate([{"$group": {"_id": None, "total": {"$sum": "$total_amount"}}}])
+    totals = await cursor.to_list(length=1)
+    return totals[0]["total"] if totals else 0.0
+
+# ETag helpers for cached listings
+def serialize_with_etag(content: Dict[str, Any]) -> Tuple[bytes, str]:
+    body = dump_json(content)
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ validators match their strong form
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def etag_response(request: Request, body: bytes, etag: str) -> Response:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+async def load_stores(db: AsyncDatabase, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> Tuple[bytes, str]:
+    page = {"skip": skip, "limit": limit, "cursor": cursor}
+    cache_key = page_cache_key("stores", page, category)
+    result = await cache_get(cache_key)
+    if result is None:
+        query = {"is_active": True}
+        if category:
+            query["category"] = category
+        stores, next_cursor = await fetch_page(db.stores, query, page, STORE_LIST_PROJECTION)
+        result = {"stores": stores, "next_cursor": next_cursor}
+        await cache_set(cache_key, result)
+    return serialize_with_etag(result)
+
+@alru_cache(maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL_SECONDS)
+async def load_cab_services(db: AsyncDatabase, skip: int, limit: int, cursor: Optional[str]) -> Tuple[bytes, str]:
+    page = {"skip": skip, "limit": limit, "cursor": cursor}
+    cache_key = page_cache_key("cab_services", page)
+    result = await cache_get(cache_key)
+    if result is None:
+        services, next_cursor = await fetch_page(db.cab_services, {"is_active": True}, page)
+        result = {"services": services, "next_cursor": next_cursor}
+        await cache_set(cache_key, result)
+    return serialize_with_etag(result)
+
+@alru_cache(maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL_SECONDS)
+async def load_handyman_services(db: AsyncDatabase, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> Tuple[bytes, str]:
+    page = {"skip": skip, "limit": limit, "cursor": cursor}
+    cache_key = page_cache_key("handyman_services", page, category)
+    result = await cache_get(cache_key)
+    if result is None:
+        query = {"is_active": True}
+        if category:
+            query["category"] = category
+        services, next_cursor = await fetch_page(db.handyman_services, query, page)
+        result = {"services": services, "next_cursor": next_cursor}
+        await cache_set(cache_key, result)
+    return serialize_with_etag(result)
 
 # Routes
 
@@ -138,327 +352,381 @@ async def health_check():
 
 # User Management
 @app.post("/api/users")
-async def create_user(user: User):
+async def create_user(user: User, db: AsyncDatabase = Depends(get_db)):
     try:
-        result = await db.users.insert_one(user.dict())
+        result = await db.users.with_options(write_concern=DURABLE_WRITE_CONCERN).insert_one(user.model_dump())
         return {"message": "User created successfully", "user_id": user.id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/users/{user_id}")
-async def get_user(user_id: str):
-    user = await db.users.find_one({"id": user_id})
+async def get_user(user_id: str, db: AsyncDatabase = Depends(get_db)):
+    user = await db.users.find_one({"id": user_id}, {"_id": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    # Convert MongoDB document to dict and remove ObjectId
-    user_dict = dict(user)
-    if '_id' in user_dict:
-        del user_dict['_id']
-    return user_dict
+    # Rendered by MongoJSONResponse so timestamps match the list endpoints' format
+    return MongoJSONResponse(user)
 
 # Store Management
 @app.get("/api/stores")
-async def get_stores(category: Optional[str] = None):
-    query = {"is_active": True}
-    if category:
-        query["category"] = category
-    
-    stores = []
-    async for store in db.stores.find(query):
-        # Convert MongoDB document to dict and remove ObjectId
-        store_dict = dict(store)
-        if '_id' in store_dict:
-            del store_dict['_id']
-        stores.append(store_dict)
-    return {"stores": stores}
+async def get_stores(request: Request, category: Optional[str] = None, page: dict = Depends(pagination_params), db: AsyncDatabase = Depends(get_db)):
+    body, etag = await load_stores(db, category, page["skip"], page["limit"], page["cursor"])
+    return etag_response(request, body, etag)
 
 @app.post("/api/stores")
-async def create_store(store: Store, current_user: dict = Depends(get_current_user)):
+async def create_store(store: Store, current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
     try:
-        result = await db.stores.insert_one(store.dict())
+        result = await db.stores.insert_one(store.model_dump())
+        await cache_invalidate("stores")
         return {"message": "Store created successfully", "store_id": store.id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 # Product Management
 @app.get("/api/products")
-async def get_products(store_id: Optional[str] = None, category: Optional[str] = None):
+async def get_products(store_id: Optional[str] = None, category: Optional[str] = None, page: dict = Depends(pagination_params), db: AsyncDatabase = Depends(get_db)):
     query = {"is_available": True}
     if store_id:
         query["store_id"] = store_id
     if category:
         query["category"] = category
     
-    products = []
-    async for product in db.products.find(query):
-        # Convert MongoDB document to dict and remove ObjectId
-        product_dict = dict(product)
-        if '_id' in product_dict:
-            del product_dict['_id']
-        products.append(product_dict)
-    return {"products": products}
+    products, next_cursor = await fetch_page(db.products, query, page, PRODUCT_LIST_PROJECTION)
+    # Return the response directly so large pages skip jsonable_encoder
+    return MongoJSONResponse({"products": products, "next_cursor": next_cursor})
 
 @app.post("/api/products")
-async def create_product(product: Product, current_user: dict = Depends(get_current_user)):
+async def create_product(product: Product, current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
     try:
-        result = await db.products.insert_one(product.dict())
+        result = await db.products.insert_one(product.model_dump())
         return {"message": "Product created successfully", "product_id": product.id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/products/bulk")
+async def create_products_bulk(products: Annotated[List[Product], Body(max_length=MAX_BULK_SIZE)], current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
+    collection = db.products.with_options(write_concern=BULK_WRITE_CONCERN)
+    product_ids = await insert_bulk(collection, products, "products")
+    return {"message": "Products created successfully", "product_ids": product_ids}
+
 # Order Management
 @app.post("/api/orders")
-async def create_order(order: Order, current_user: dict = Depends(get_current_user)):
+async def create_order(order: Order, current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
     try:
-        result = await db.orders.insert_one(order.dict())
+        result = await db.orders.with_options(write_concern=DURABLE_WRITE_CONCERN).insert_one(order.model_dump())
         return {"message": "Order created successfully", "order_id": order.id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/orders/bulk")
+async def create_orders_bulk(orders: Annotated[List[Order], Body(max_length=MAX_BULK_SIZE)], current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
+    collection = db.orders.with_options(write_concern=DURABLE_WRITE_CONCERN)
+    order_ids = await insert_bulk(collection, orders, "orders")
+    return {"message": "Orders created successfully", "order_ids": order_ids}
+
 @app.get("/api/orders")
-async def get_orders(user_id: Optional[str] = None, status: Optional[str] = None):
+async def get_orders(user_id: Optional[str] = None, status: Optional[str] = None, page: dict = Depends(pagination_params), db: AsyncDatabase = Depends(get_db)):
     query = {}
     if user_id:
         query["user_id"] = user_id
     if status:
         query["status"] = status
     
-    orders = []
-    async for order in db.orders.find(query):
-        # Convert MongoDB document to dict and remove ObjectId
-        order_dict = dict(order)
-        if '_id' in order_dict:
-            del order_dict['_id']
-        orders.append(order_dict)
-    return {"orders": orders}
+    orders, next_cursor = await fetch_page(db.orders, query, page)
+    # Return the response directly so large pages skip jsonable_encoder
+    return MongoJSONResponse({"orders": orders, "next_cursor": next_cursor})
+
+@app.get("/api/orders/expanded")
+async def get_orders_expanded(user_id: str, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), db: AsyncDatabase = Depends(get_db)):
+    # Orders joined with their store and products server-side, so clients
+    # don't re-fetch each store and product. Limit first so only one page is joined.
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        # _id breaks ties between orders from the same bulk insert
+        {"$sort": {"order_time": -1, "_id": -1}},
+        {"$limit": limit},
+        {"$lookup": {"from": "stores", "localField": "store_id", "foreignField": "id", "as": "store"}},
+        {"$unwind": {"path": "$store", "preserveNullAndEmptyArrays": True}},
+        {"$lookup": {"from": "products", "localField": "items.product_id", "foreignField": "id", "as": "products"}},
+        {"$project": {"_id": 0, "store._id": 0, "products._id": 0}},
+    ]
+    cursor = await db.orders.aggregate(pipeline)
+    orders = await cursor.to_list(length=limit)
+    return MongoJSONResponse({"orders": orders})
 
 # Cab Service Management
 @app.get("/api/cab-services")
-async def get_cab_services():
-    services = []
-    async for service in db.cab_services.find({"is_active": True}):
-        # Convert MongoDB document to dict and remove ObjectId
-        service_dict = dict(service)
-        if '_id' in service_dict:
-            del service_dict['_id']
-        services.append(service_dict)
-    return {"services": services}
+async def get_cab_services(request: Request, page: dict = Depends(pagination_params), db: AsyncDatabase = Depends(get_db)):
+    body, etag = await load_cab_services(db, page["skip"], page["limit"], page["cursor"])
+    return etag_response(request, body, etag)
 
 @app.post("/api/cab-bookings")
-async def create_cab_booking(booking: CabBooking, current_user: dict = Depends(get_current_user)):
+async def create_cab_booking(booking: CabBooking, current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
+    # With w=0 this only catches client-side errors (e.g. no reachable server);
+    # server-side failures such as duplicate ids are not reported back.
     try:
-        result = await db.cab_bookings.insert_one(booking.dict())
+        result = await db.cab_bookings.with_options(write_concern=FAST_WRITE_CONCERN).insert_one(booking.model_dump())
         return {"message": "Cab booking created successfully", "booking_id": booking.id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/cab-bookings")
-async def get_cab_bookings(user_id: Optional[str] = None, status: Optional[str] = None):
+async def get_cab_bookings(user_id: Optional[str] = None, status: Optional[str] = None, page: dict = Depends(pagination_params), db: AsyncDatabase = Depends(get_db)):
     query = {}
     if user_id:
         query["user_id"] = user_id
     if status:
         query["status"] = status
     
-    bookings = []
-    async for booking in db.cab_bookings.find(query):
-        # Convert MongoDB document to dict and remove ObjectId
-        booking_dict = dict(booking)
-        if '_id' in booking_dict:
-            del booking_dict['_id']
-        bookings.append(booking_dict)
-    return {"bookings": bookings}
+    bookings, next_cursor = await fetch_page(db.cab_bookings, query, page)
+    # Return the response directly so large pages skip jsonable_encoder
+    return MongoJSONResponse({"bookings": bookings, "next_cursor": next_cursor})
 
 # Handyman Services
 @app.get("/api/handyman-services")
-async def get_handyman_services(category: Optional[str] = None):
-    query = {"is_active": True}
-    if category:
-        query["category"] = category
-    
-    services = []
-    async for service in db.handyman_services.find(query):
-        # Convert MongoDB document to dict and remove ObjectId
-        service_dict = dict(service)
-        if '_id' in service_dict:
-            del service_dict['_id']
-        services.append(service_dict)
-    return {"services": services}
+async def get_handyman_services(request: Request, category: Optional[str] = None, page: dict = Depends(pagination_params), db: AsyncDatabase = Depends(get_db)):
+    body, etag = await load_handyman_services(db, category, page["skip"], page["limit"], page["cursor"])
+    return etag_response(request, body, etag)
 
 @app.post("/api/handyman-bookings")
-async def create_handyman_booking(booking: HandymanBooking, current_user: dict = Depends(get_current_user)):
+async def create_handyman_booking(booking: HandymanBooking, current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
+    # With w=0 this only catches client-side errors (e.g. no reachable server);
+    # server-side failures such as duplicate ids are not reported back.
     try:
-        result = await db.handyman_bookings.insert_one(booking.dict())
+        result = await db.handyman_bookings.with_options(write_concern=FAST_WRITE_CONCERN).insert_one(booking.model_dump())
         return {"message": "Handyman booking created successfully", "booking_id": booking.id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/handyman-bookings")
-async def get_handyman_bookings(user_id: Optional[str] = None, status: Optional[str] = None):
+async def get_handyman_bookings(user_id: Optional[str] = None, status: Optional[str] = None, page: dict = Depends(pagination_params), db: AsyncDatabase = Depends(get_db)):
     query = {}
     if user_id:
         query["user_id"] = user_id
     if status:
         query["status"] = status
     
-    bookings = []
-    async for booking in db.handyman_bookings.find(query):
-        # Convert MongoDB document to dict and remove ObjectId
-        booking_dict = dict(booking)
-        if '_id' in booking_dict:
-            del booking_dict['_id']
-        bookings.append(booking_dict)
-    return {"bookings": bookings}
+    bookings, next_cursor = await fetch_page(db.handyman_bookings, query, page)
+    # Return the response directly so large pages skip jsonable_encoder
+    return MongoJSONResponse({"bookings": bookings, "next_cursor": next_cursor})
+
+# Combined Bookings
+@app.get("/api/bookings")
+async def get_user_bookings(user_id: str, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), db: AsyncDatabase = Depends(get_db)):
+    # Cab and handyman bookings merged server-side in one round-trip (MongoDB 4.4+).
+    # booked_at normalises booking_time/created_at so both kinds sort together.
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$set": {"booking_type": "cab", "booked_at": "$booking_time"}},
+        {"$unionWith": {
+            "coll": "handyman_bookings",
+            "pipeline": [
+                {"$match": {"user_id": user_id}},
+                {"$set": {"booking_type": "handyman", "booked_at": "$created_at"}},
+            ],
+        }},
+        # _id breaks ties between bookings made in the same millisecond
+        {"$sort": {"booked_at": -1, "_id": -1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0}},
+    ]
+    cursor = await db.cab_bookings.aggregate(pipeline)
+    bookings = await cursor.to_list(length=limit)
+    return MongoJSONResponse({"bookings": bookings})
 
 # Analytics & Dashboard
 @app.get("/api/analytics/dashboard")
-async def get_dashboard_analytics(current_user: dict = Depends(get_current_user)):
-    total_users = await db.users.count_documents({})
-    total_orders = await db.orders.count_documents({})
-    total_stores = await db.stores.count_documents({"is_active": True})
-    total_bookings = (
-        await db.cab_bookings.count_documents({}) + 
-        await db.handyman_bookings.count_documents({})
+async def get_dashboard_analytics(current_user: AuthCtx = Depends(get_current_user), db: AsyncDatabase = Depends(get_db)):
+    cached = await cache_get("analytics:dashboard")
+    if cached:
+        return cached
+
+    # Run the counts concurrently; unfiltered counts use collection metadata
+    total_users, total_orders, total_stores, cab_bookings, handyman_bookings, revenue = await asyncio.gather(
+        db.users.estimated_document_count(),
+        db.orders.estimated_document_count(),
+        db.stores.count_documents({"is_active": True}),
+        db.cab_bookings.estimated_document_count(),
+        db.handyman_bookings.estimated_document_count(),
+        get_order_revenue(db),
     )
     
-    return {
+    result = {
         "total_users": total_users,
         "total_orders": total_orders,
         "total_stores": total_stores,
-        "total_bookings": total_bookings,
-        "revenue": 125000.0,  # Dummy data
+        "total_bookings": cab_bookings + handyman_bookings,
+        "revenue": revenue,
         "growth_rate": 15.5,  # Dummy data
     }
+    await cache_set("analytics:dashboard", result)
+    return result
+
+# Sample data
+SAMPLE_STORES = (
+    {
+        "id": "store-1",
+        "name": "Fresh Mart Kadapa",
+        "description": "Premium grocery store with fresh vegetables and fruits",
+        "category": "grocery",
+        "vendor_id": "vendor-1",
+        "location": {"city": "Kadapa", "state": "Andhra Pradesh", "pincode": "516001"},
+        "rating": 4.5,
+        "delivery_time": "20-30 mins",
+        "is_active": True
+    },
+    {
+        "id": "store-2",
+        "name": "Electronics Hub",
+        "description": "Latest electronics and gadgets",
+        "category": "electronics",
+        "vendor_id": "vendor-2",
+        "location": {"city": "Kadapa", "state": "Andhra Pradesh", "pincode": "516001"},
+        "rating": 4.2,
+        "delivery_time": "45-60 mins",
+        "is_active": True
+    }
+)
+
+SAMPLE_PRODUCTS = (
+    {
+        "id": "prod-1",
+        "name": "Fresh Tomatoes",
+        "description": "Farm fresh tomatoes from local farms",
+        "price": 40.0,
+        "category": "vegetables",
+        "store_id": "store-1",
+        "images": ["https://images.unsplash.com/photo-1588964895597-cfccd6e2dbf9"],
+        "stock": 100,
+        "is_available": True
+    },
+    {
+        "id": "prod-2",
+        "name": "Basmati Rice (5kg)",
+        "description": "Premium quality basmati rice",
+        "price": 450.0,
+        "category": "groceries",
+        "store_id": "store-1",
+        "images": ["https://images.unsplash.com/photo-1695653422259-8a74ffe90401"],
+        "stock": 50,
+        "is_available": True
+    }
+)
+
+SAMPLE_CAB_SERVICES = (
+    {
+        "id": "cab-1",
+        "service_type": "economy",
+        "available_slots": 15,
+        "price_per_km": 12.0,
+        "base_fare": 50.0,
+        "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
+        "is_active": True
+    },
+    {
+        "id": "cab-2",
+        "service_type": "premium",
+        "available_slots": 8,
+        "price_per_km": 18.0,
+        "base_fare": 80.0,
+        "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
+        "is_active": True
+    }
+)
+
+SAMPLE_HANDYMAN_SERVICES = (
+    {
+        "id": "handy-1",
+        "category": "plumbing",
+        "professional_id": "prof-1",
+        "name": "Expert Plumbing Services",
+        "description": "Professional plumbing repairs and installations",
+        "price_range": "₹300-₹800",
+        "rating": 4.7,
+        "availability": ["morning", "afternoon", "evening"],
+        "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
+        "is_active": True
+    },
+    {
+        "id": "handy-2",
+        "category": "electrical",
+        "professional_id": "prof-2",
+        "name": "Electrical Solutions",
+        "description": "Complete electrical repairs and maintenance",
+        "price_range": "₹250-₹600",
+        "rating": 4.5,
+        "availability": ["morning", "afternoon"],
+        "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
+        "is_active": True
+    }
+)
+
+def seed_ops(docs, created_at: Optional[datetime] = None) -> List[UpdateOne]:
+    # Upserts only insert missing documents; the sample constants are never mutated
+    extra = {"created_at": created_at} if created_at else {}
+    return [UpdateOne({"id": doc["id"]}, {"$setOnInsert": {**doc, **extra}}, upsert=True) for doc in docs]
 
 # Initialize sample data
 @app.on_event("startup")
 async def startup_event():
-    # Create sample stores
-    sample_stores = [
-        {
-            "id": "store-1",
-            "name": "Fresh Mart Kadapa",
-            "description": "Premium grocery store with fresh vegetables and fruits",
-            "category": "grocery",
-            "vendor_id": "vendor-1",
-            "location": {"city": "Kadapa", "state": "Andhra Pradesh", "pincode": "516001"},
-            "rating": 4.5,
-            "delivery_time": "20-30 mins",
-            "is_active": True,
-            "created_at": datetime.now()
-        },
-        {
-            "id": "store-2", 
-            "name": "Electronics Hub",
-            "description": "Latest electronics and gadgets",
-            "category": "electronics",
-            "vendor_id": "vendor-2",
-            "location": {"city": "Kadapa", "state": "Andhra Pradesh", "pincode": "516001"},
-            "rating": 4.2,
-            "delivery_time": "45-60 mins",
-            "is_active": True,
-            "created_at": datetime.now()
-        }
-    ]
-    
-    for store in sample_stores:
-        existing = await db.stores.find_one({"id": store["id"]})
-        if not existing:
-            await db.stores.insert_one(store)
-
-    # Create sample products
-    sample_products = [
-        {
-            "id": "prod-1",
-            "name": "Fresh Tomatoes",
-            "description": "Farm fresh tomatoes from local farms",
-            "price": 40.0,
-            "category": "vegetables",
-            "store_id": "store-1",
-            "images": ["https://images.unsplash.com/photo-1588964895597-cfccd6e2dbf9"],
-            "stock": 100,
-            "is_available": True,
-            "created_at": datetime.now()
-        },
-        {
-            "id": "prod-2",
-            "name": "Basmati Rice (5kg)",
-            "description": "Premium quality basmati rice",
-            "price": 450.0,
-            "category": "groceries",
-            "store_id": "store-1",
-            "images": ["https://images.unsplash.com/photo-1695653422259-8a74ffe90401"],
-            "stock": 50,
-            "is_available": True,
-            "created_at": datetime.now()
-        }
-    ]
-    
-    for product in sample_products:
-        existing = await db.products.find_one({"id": product["id"]})
-        if not existing:
-            await db.products.insert_one(product)
-
-    # Create sample cab services
-    sample_cab_services = [
-        {
-            "id": "cab-1",
-            "service_type": "economy",
-            "available_slots": 15,
-            "price_per_km": 12.0,
-            "base_fare": 50.0,
-            "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
-            "is_active": True
-        },
-        {
-            "id": "cab-2",
-            "service_type": "premium",
-            "available_slots": 8,
-            "price_per_km": 18.0,
-            "base_fare": 80.0,
-            "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
-            "is_active": True
-        }
-    ]
-    
-    for service in sample_cab_services:
-        existing = await db.cab_services.find_one({"id": service["id"]})
-        if not existing:
-            await db.cab_services.insert_one(service)
-
-    # Create sample handyman services
-    sample_handyman_services = [
-        {
-            "id": "handy-1",
-            "category": "plumbing",
-            "professional_id": "prof-1",
-            "name": "Expert Plumbing Services",
-            "description": "Professional plumbing repairs and installations",
-            "price_range": "₹300-₹800",
-            "rating": 4.7,
-            "availability": ["morning", "afternoon", "evening"],
-            "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
-            "is_active": True
-        },
-        {
-            "id": "handy-2",
-            "category": "electrical",
-            "professional_id": "prof-2",
-            "name": "Electrical Solutions",
-            "description": "Complete electrical repairs and maintenance",
-            "price_range": "₹250-₹600",
-            "rating": 4.5,
-            "availability": ["morning", "afternoon"],
-            "location": {"city": "Kadapa", "state": "Andhra Pradesh"},
-            "is_active": True
-        }
-    ]
-    
-    for service in sample_handyman_services:
-        existing = await db.handyman_services.find_one({"id": service["id"]})
-        if not existing:
-            await db.handyman_services.insert_one(service)
+    app.state.mongo_client = AsyncMongoClient(settings.mongo_url, **MONGO_POOL_OPTIONS)
+    app.state.db = db = app.state.mongo_client.grocery_platform
+    app.state.redis = aioredis.from_url(settings.redis_url, **REDIS_OPTIONS)
+
+    # Create indexes matching the list endpoint filters. fetch_page sorts on _id,
+    # so each index is equality fields followed by _id and serves filter and sort together.
+    # Unique ids let the sample data upserts below match a single document.
+    # One create_indexes call per collection, all collections concurrently.
+    def user_lookup_indexes():
+        return [
+            IndexModel([("user_id", 1), ("_id", 1)]),
+            IndexModel([("user_id", 1), ("status", 1), ("_id", 1)]),
+        ]
+
+    await asyncio.gather(
+        db.users.create_indexes([IndexModel("id", unique=True)]),
+        db.stores.create_indexes([
+            IndexModel("id", unique=True),
+            IndexModel([("is_active", 1), ("_id", 1)]),
+            IndexModel([("is_active", 1), ("category", 1), ("_id", 1)]),
+        ]),
+        db.products.create_indexes([
+            IndexModel("id", unique=True),
+            IndexModel([("is_available", 1), ("_id", 1)]),
+            IndexModel([("is_available", 1), ("store_id", 1), ("_id", 1)]),
+            IndexModel([("is_available", 1), ("category", 1), ("_id", 1)]),
+        ]),
+        db.cab_services.create_indexes([
+            IndexModel("id", unique=True),
+            IndexModel([("is_active", 1), ("_id", 1)]),
+        ]),
+        db.handyman_services.create_indexes([
+            IndexModel("id", unique=True),
+            IndexModel([("is_active", 1), ("_id", 1)]),
+            IndexModel([("is_active", 1), ("category", 1), ("_id", 1)]),
+        ]),
+        db.orders.create_indexes([
+            *user_lookup_indexes(),
+            # Serves /api/orders/expanded's newest-first sort
+            IndexModel([("user_id", 1), ("order_time", -1), ("_id", -1)]),
+        ]),
+        db.cab_bookings.create_indexes(user_lookup_indexes()),
+        db.handyman_bookings.create_indexes(user_lookup_indexes()),
+    )
+
+    # Seed sample data; created_at is stamped once per startup
+    seeded_at = utc_now()
+    await db.stores.bulk_write(seed_ops(SAMPLE_STORES, created_at=seeded_at), ordered=False)
+    await db.products.bulk_write(seed_ops(SAMPLE_PRODUCTS, created_at=seeded_at), ordered=False)
+    await db.cab_services.bulk_write(seed_ops(SAMPLE_CAB_SERVICES), ordered=False)
+    await db.handyman_services.bulk_write(seed_ops(SAMPLE_HANDYMAN_SERVICES), ordered=False)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await app.state.mongo_client.close()
+    await app.state.redis.aclose()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # Multiple workers need an import string rather than the app object
+    uvicorn.run("server:app", host="0.0.0.0", port=8001, loop="uvloop", http="httptools", workers=os.cpu_count())
@@ -1,6 +1,8 @@
-import requests
+import asyncio
+import httpx
 import sys
 import json
+import uuid
 from datetime import datetime
 
 class ServiceHubAPITester:
@@ -9,8 +11,9 @@ class ServiceHubAPITester:
         self.token = "dummy-token"  # Using dummy token as per backend implementation
         self.tests_run = 0
         self.tests_passed = 0
+        self.client = None  # Shared httpx.AsyncClient, set by main()
 
-    def run_test(self, name, method, endpoint, expected_status, data=None, headers=None):
+    async def run_test(self, name, method, endpoint, expected_status, data=None, headers=None, log=None):
         """Run a single API test"""
         url = f"{self.base_url}/{endpoint}"
         test_headers = {'Content-Type': 'application/json'}
@@ -21,101 +24,135 @@ class ServiceHubAPITester:
         if self.token and 'Authorization' not in test_headers:
             test_headers['Authorization'] = f'Bearer {self.token}'
 
+        # Tests run concurrently, so output is buffered and printed per test
+        lines = log if log is not None else []
+
         self.tests_run += 1
-        print(f"\n🔍 Testing {name}...")
-        print(f"   URL: {url}")
+        lines.append(f"\n🔍 Testing {name}...")
+        lines.append(f"   URL: {url}")
         
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=test_headers)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=test_headers)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=test_headers)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=test_headers)
+            response = await self.client.request(method, url, json=data, headers=test_headers)
 
             success = response.status_code == expected_status
             if success:
                 self.tests_passed += 1
-                print(f"✅ Passed - Status: {response.status_code}")
+                lines.append(f"✅ Passed - Status: {response.status_code}")
                 try:
                     response_data = response.json()
                     if isinstance(response_data, dict):
                         # Print key information from response
                         if 'stores' in response_data:
-                            print(f"   Found {len(response_data['stores'])} stores")
+                            lines.append(f"   Found {len(response_data['stores'])} stores")
                         elif 'products' in response_data:
-                            print(f"   Found {len(response_data['products'])} products")
+                            lines.append(f"   Found {len(response_data['products'])} products")
                         elif 'services' in response_data:
-                            print(f"   Found {len(response_data['services'])} services")
+                            lines.append(f"   Found {len(response_data['services'])} services")
                         elif 'total_users' in response_data:
-                            print(f"   Dashboard data: {response_data}")
+                            lines.append(f"   Dashboard data: {response_data}")
                 except:
                     pass
             else:
-                print(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
+                lines.append(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
                 try:
                     error_detail = response.json()
-                    print(f"   Error: {error_detail}")
+                    lines.append(f"   Error: {error_detail}")
                 except:
-                    print(f"   Response: {response.text}")
+                    lines.append(f"   Response: {response.text}")
 
             return success, response.json() if response.content else {}
 
         except Exception as e:
-            print(f"❌ Failed - Error: {str(e)}")
+            lines.append(f"❌ Failed - Error: {str(e)}")
             return False, {}
 
-    def test_health_check(self):
+        finally:
+            if log is None:
+                flush(lines)
+
+    def check(self, name, condition, log, detail=""):
+        """Record a check on response content as a test"""
+        self.tests_run += 1
+        if condition:
+            self.tests_passed += 1
+            log.append(f"✅ Passed - {name}")
+        else:
+            log.append(f"❌ Failed - {name}{f': {detail}' if detail else ''}")
+        return condition
+
+    async def test_health_check(self):
         """Test health check endpoint"""
-        return self.run_test("Health Check", "GET", "api/health", 200)
+        return await self.run_test("Health Check", "GET", "api/health", 200)
 
-    def test_stores_endpoint(self):
+    async def test_stores_endpoint(self):
         """Test stores endpoint"""
-        success, response = self.run_test("Get All Stores", "GET", "api/stores", 200)
+        log = []
+        success, response = await self.run_test("Get All Stores", "GET", "api/stores", 200, log=log)
         if success and 'stores' in response:
             stores = response['stores']
-            print(f"   Store details:")
+            log.append(f"   Store details:")
             for store in stores:
-                print(f"     - {store.get('name', 'Unknown')} ({store.get('category', 'Unknown')})")
+                log.append(f"     - {store.get('name', 'Unknown')} ({store.get('category', 'Unknown')})")
+        flush(log)
         return success
 
-    def test_products_endpoint(self):
+    async def test_products_endpoint(self):
         """Test products endpoint"""
-        success, response = self.run_test("Get All Products", "GET", "api/products", 200)
+        log = []
+        success, response = await self.run_test("Get All Products", "GET", "api/products", 200, log=log)
         if success and 'products' in response:
             products = response['products']
-            print(f"   Product details:")
+            log.append(f"   Product details:")
             for product in products:
-                print(f"     - {product.get('name', 'Unknown')} - ₹{product.get('price', 0)}")
+                log.append(f"     - {product.get('name', 'Unknown')} - ₹{product.get('price', 0)}")
+        flush(log)
         return success
 
-    def test_cab_services_endpoint(self):
+    async def test_cab_services_endpoint(self):
         """Test cab services endpoint"""
-        success, response = self.run_test("Get Cab Services", "GET", "api/cab-services", 200)
+        log = []
+        success, response = await self.run_test("Get Cab Services", "GET", "api/cab-services", 200, log=log)
         if success and 'services' in response:
             services = response['services']
-            print(f"   Cab service details:")
+            log.append(f"   Cab service details:")
             for service in services:
-                print(f"     - {service.get('service_type', 'Unknown')} - Base: ₹{service.get('base_fare', 0)}, Per km: ₹{service.get('price_per_km', 0)}")
+                log.append(f"     - {service.get('service_type', 'Unknown')} - Base: ₹{service.get('base_fare', 0)}, Per km: ₹{service.get('price_per_km', 0)}")
+        flush(log)
         return success
 
-    def test_handyman_services_endpoint(self):
+    async def test_handyman_services_endpoint(self):
         """Test handyman services endpoint"""
-        success, response = self.run_test("Get Handyman Services", "GET", "api/handyman-services", 200)
+        log = []
+        success, response = await self.run_test("Get Handyman Services", "GET", "api/handyman-services", 200, log=log)
         if success and 'services' in response:
             services = response['services']
-            print(f"   Handyman service details:")
+            log.append(f"   Handyman service details:")
             for service in services:
-                print(f"     - {service.get('name', 'Unknown')} ({service.get('category', 'Unknown')}) - {service.get('price_range', 'N/A')}")
+                log.append(f"     - {service.get('name', 'Unknown')} ({service.get('category', 'Unknown')}) - {service.get('price_range', 'N/A')}")
+        flush(log)
         return success
 
-    def test_dashboard_analytics(self):
+    async def test_dashboard_analytics(self):
         """Test dashboard analytics endpoint"""
-        return self.run_test("Dashboard Analytics", "GET", "api/analytics/dashboard", 200)
+        return await self.run_test("Dashboard Analytics", "GET", "api/analytics/dashboard", 200)
 
-    def test_create_user(self):
+    async def test_etag_not_modified(self, endpoint, weak=False):
+        """Test that re-fetching a cached listing with its ETag returns 304"""
+        response = await self.client.get(f"{self.base_url}/{endpoint}")
+        etag = response.headers.get("etag")
+        if not etag:
+            self.tests_run += 1
+            flush([f"\n🔍 Testing ETag on {endpoint}...", f"❌ Failed - No ETag header (status {response.status_code})"])
+            return False
+        if weak:
+            etag = f"W/{etag}"
+        success, _ = await self.run_test(
+            f"Conditional GET {endpoint} ({'weak' if weak else 'strong'} ETag)",
+            "GET", endpoint, 304, headers={"If-None-Match": etag}
+        )
+        return success
+
+    async def test_create_user(self):
         """Test user creation"""
         user_data = {
             "email": f"test_user_{datetime.now().strftime('%H%M%S')}@example.com",
@@ -124,9 +161,9 @@ class ServiceHubAPITester:
             "role": "customer",
             "location": {"city": "Kadapa", "state": "Andhra Pradesh"}
         }
-        return self.run_test("Create User", "POST", "api/users", 200, data=user_data)
+        return await self.run_test("Create User", "POST", "api/users", 200, data=user_data)
 
-    def test_create_store(self):
+    async def test_create_store(self):
         """Test store creation"""
         store_data = {
             "name": "Test Store",
@@ -135,9 +172,9 @@ class ServiceHubAPITester:
             "vendor_id": "test-vendor-1",
             "location": {"city": "Kadapa", "state": "Andhra Pradesh", "pincode": "516001"}
         }
-        return self.run_test("Create Store", "POST", "api/stores", 200, data=store_data)
+        return await self.run_test("Create Store", "POST", "api/stores", 200, data=store_data)
 
-    def test_create_product(self):
+    async def test_create_product(self):
         """Test product creation"""
         product_data = {
             "name": "Test Product",
@@ -147,30 +184,174 @@ class ServiceHubAPITester:
             "store_id": "store-1",
             "stock": 10
         }
-        return self.run_test("Create Product", "POST", "api/products", 200, data=product_data)
+        return await self.run_test("Create Product", "POST", "api/products", 200, data=product_data)
+
+    async def test_combined_bookings(self):
+        """Test that /api/bookings merges cab and handyman bookings for one user"""
+        log = []
+        user_id = f"test-user-{uuid.uuid4().hex}"
+        cab_data = {
+            "user_id": user_id,
+            "pickup_location": {"city": "Kadapa", "address": "Bus Stand"},
+            "destination": {"city": "Kadapa", "address": "Railway Station"},
+            "service_type": "economy"
+        }
+        handyman_data = {
+            "user_id": user_id,
+            "service_id": "handy-1",
+            "professional_id": "prof-1",
+            "booking_date": "2025-01-01",
+            "time_slot": "morning"
+        }
+        # Created in order so the handyman booking is the newest
+        cab_ok, _ = await self.run_test("Create Cab Booking", "POST", "api/cab-bookings", 200, data=cab_data, log=log)
+        # Keep the two timestamps apart at MongoDB's millisecond resolution
+        await asyncio.sleep(0.01)
+        handyman_ok, _ = await self.run_test("Create Handyman Booking", "POST", "api/handyman-bookings", 200, data=handyman_data, log=log)
+        if not (cab_ok and handyman_ok):
+            flush(log)
+            return False
+
+        # Booking inserts are unacknowledged (w=0), so allow a moment for them to land
+        bookings = []
+        for _ in range(10):
+            response = await self.client.get(f"{self.base_url}/api/bookings", params={"user_id": user_id})
+            bookings = response.json().get("bookings", []) if response.status_code == 200 else []
+            if len(bookings) == 2:
+                break
+            await asyncio.sleep(0.2)
+
+        success = self.check("Combined bookings returns both bookings", len(bookings) == 2, log, f"got {len(bookings)}")
+        if success:
+            types = [b.get("booking_type") for b in bookings]
+            success &= self.check("Bookings sorted newest first with booking_type", types == ["handyman", "cab"], log, f"got {types}")
+            success &= self.check("booked_at descending", bookings[0].get("booked_at", "") >= bookings[1].get("booked_at", ""), log)
+        flush(log)
+        return success
+
+    async def test_expanded_orders(self):
+        """Test that /api/orders/expanded attaches the store and products to an order"""
+        log = []
+        user_id = f"test-user-{uuid.uuid4().hex}"
+        order_data = {
+            "user_id": user_id,
+            "store_id": "store-1",
+            "items": [{"product_id": "prod-1", "quantity": 2}, {"product_id": "prod-2", "quantity": 1}],
+            "total_amount": 530.0,
+            "delivery_address": {"city": "Kadapa", "state": "Andhra Pradesh", "pincode": "516001"}
+        }
+        created, _ = await self.run_test("Create Order", "POST", "api/orders", 200, data=order_data, log=log)
+        if not created:
+            flush(log)
+            return False
+
+        success, response = await self.run_test(
+            "Get Expanded Orders", "GET", f"api/orders/expanded?user_id={user_id}", 200, log=log
+        )
+        orders = response.get("orders", []) if success else []
+        success &= self.check("Expanded orders returns the order", len(orders) == 1, log, f"got {len(orders)}")
+        if success:
+            order = orders[0]
+            store_id = order.get("store", {}).get("id")
+            product_ids = sorted(p.get("id") for p in order.get("products", []))
+            success &= self.check("Store attached", store_id == "store-1", log, f"got {store_id}")
+            success &= self.check("Products attached", product_ids == ["prod-1", "prod-2"], log, f"got {product_ids}")
+        flush(log)
+        return success
+
+    def bulk_product(self, **overrides):
+        product = {
+            "name": "Bulk Test Product",
+            "description": "A product created through the bulk endpoint",
+            "price": 10.0,
+            "category": "test",
+            "store_id": "store-1",
+            "stock": 5
+        }
+        product.update(overrides)
+        return product
+
+    async def test_bulk_endpoints(self):
+        """Test bulk product/order creation, partial failures and the size cap"""
+        log = []
+        success, response = await self.run_test(
+            "Bulk Create Products", "POST", "api/products/bulk", 200,
+            data=[self.bulk_product(), self.bulk_product()], log=log
+        )
+        success &= self.check("Bulk products returns both ids", len(response.get("product_ids", [])) == 2, log)
+
+        user_id = f"test-user-{uuid.uuid4().hex}"
+        order = {
+            "user_id": user_id,
+            "store_id": "store-1",
+            "items": [{"product_id": "prod-1", "quantity": 1}],
+            "total_amount": 40.0,
+            "delivery_address": {"city": "Kadapa"}
+        }
+        ok, response = await self.run_test("Bulk Create Orders", "POST", "api/orders/bulk", 200, data=[order, order], log=log)
+        success &= ok and self.check("Bulk orders returns both ids", len(response.get("order_ids", [])) == 2, log)
+
+        # Same id twice: the first insert commits, the second hits the unique index
+        duplicate_id = uuid.uuid4().hex
+        ok, response = await self.run_test(
+            "Bulk Create Products (duplicate id)", "POST", "api/products/bulk", 400,
+            data=[self.bulk_product(id=duplicate_id), self.bulk_product(id=duplicate_id)], log=log
+        )
+        detail = response.get("detail", {}) if isinstance(response.get("detail"), dict) else {}
+        success &= ok and self.check(
+            "Partial failure reports inserted and failed items",
+            detail.get("inserted_ids") == [duplicate_id] and [f.get("index") for f in detail.get("failed", [])] == [1],
+            log, f"got {detail}"
+        )
+
+        ok, _ = await self.run_test("Bulk Create Products (empty)", "POST", "api/products/bulk", 400, data=[], log=log)
+        success &= ok
+        ok, _ = await self.run_test(
+            "Bulk Create Products (over cap)", "POST", "api/products/bulk", 422,
+            data=[self.bulk_product() for _ in range(201)], log=log
+        )
+        success &= ok
+        flush(log)
+        return success
 
-def main():
+def flush(lines):
+    """Print a test's buffered output in one block"""
+    print("\n".join(lines))
+
+async def main():
     print("🚀 Starting ServiceHub API Testing...")
     print("=" * 60)
     
     # Initialize tester
     tester = ServiceHubAPITester()
     
-    # Run all tests
-    print("\n📋 BASIC ENDPOINT TESTS")
-    print("-" * 30)
-    tester.test_health_check()
-    tester.test_stores_endpoint()
-    tester.test_products_endpoint()
-    tester.test_cab_services_endpoint()
-    tester.test_handyman_services_endpoint()
-    tester.test_dashboard_analytics()
-    
-    print("\n📋 CREATE OPERATION TESTS")
-    print("-" * 30)
-    tester.test_create_user()
-    tester.test_create_store()
-    tester.test_create_product()
+    # One pooled keep-alive client shared by every test; tests in a section run concurrently
+    async with httpx.AsyncClient() as client:
+        tester.client = client
+
+        print("\n📋 BASIC ENDPOINT TESTS")
+        print("-" * 30)
+        await asyncio.gather(
+            tester.test_health_check(),
+            tester.test_stores_endpoint(),
+            tester.test_products_endpoint(),
+            tester.test_cab_services_endpoint(),
+            tester.test_handyman_services_endpoint(),
+            tester.test_dashboard_analytics(),
+            tester.test_etag_not_modified("api/stores"),
+            tester.test_etag_not_modified("api/cab-services", weak=True),
+        )
+        
+        print("\n📋 CREATE OPERATION TESTS")
+        print("-" * 30)
+        await asyncio.gather(
+            tester.test_create_user(),
+            tester.test_create_store(),
+            tester.test_create_product(),
+            tester.test_combined_bookings(),
+            tester.test_expanded_orders(),
+            tester.test_bulk_endpoints(),
+        )
     
     # Print final results
     print("\n" + "=" * 60)
@@ -185,4 +366,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
\ No newline at end of file